@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Cache em disco com TTL para respostas JSON das APIs
+Compartilhado entre flight_price_apis e public_apis
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+try:
+    import fcntl
+except ImportError:  # Windows: cache sem lock entre processos
+    fcntl = None
+
+# orjson é opcional: parsing/serialização mais rápidos, com fallback para json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Cache em disco das respostas (fora de data/ para não versionar respostas brutas)
+# Não guardar credenciais aqui: o diretório vai para o cache do GitHub Actions
+CACHE_DIR = Path(__file__).resolve().parent.parent / '.cache'
+
+
+def json_loads(data) -> Any:
+    """Decodificar JSON (bytes ou str) com orjson quando disponível"""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(data) -> bytes:
+    """Serializar em JSON compacto (UTF-8) com orjson quando disponível"""
+    if orjson:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _lock_file(f, exclusive: bool = False):
+    """Lock consultivo no arquivo de cache (liberado ao fechar)"""
+    if fcntl:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+
+
+def _load_cache_entries(f) -> Dict:
+    try:
+        entries = json_loads(f.read())
+    except ValueError:
+        return {}
+    return entries if isinstance(entries, dict) else {}
+
+
+def cached_get_json(cache_path: Path, key: str, ttl_seconds: int,
+                    fetch_fn: Callable[[], Any]) -> Any:
+    """
+    Cache em disco com TTL para respostas JSON
+    Formato: {key: {"expires": epoch, "payload": <json>}}
+    Erros de fetch não são cacheados; erros de I/O do cache são ignorados
+    """
+    now = time.time()
+
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            _lock_file(f)
+            entry = _load_cache_entries(f).get(key)
+        if isinstance(entry, dict) and entry.get('expires', 0) > now:
+            return entry['payload']
+    except OSError:
+        pass
+
+    # Rede fora do lock para não serializar buscas concorrentes
+    payload = fetch_fn()
+
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(cache_path, 'a+', encoding='utf-8') as f:
+            _lock_file(f, exclusive=True)
+            f.seek(0)
+            entries = {
+                k: v for k, v in _load_cache_entries(f).items()
+                if isinstance(v, dict) and v.get('expires', 0) > now
+            }
+            entries[key] = {'expires': now + ttl_seconds, 'payload': payload}
+            f.seek(0)
+            f.truncate()
+            json.dump(entries, f, ensure_ascii=False)
+    except OSError:
+        pass
+
+    return payload
@@ -6,10 +6,79 @@ APIs focadas em PREÇOS de passagens e MILHAS para GitHub Actions
 
 import requests
 import json
+import logging
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 import os
-import time
+import re
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from api_cache import CACHE_DIR, cached_get_json, json_loads
+
+# Mensagens de progresso das APIs: silenciosas por padrão, LOG_LEVEL=DEBUG para detalhes
+logger = logging.getLogger(__name__)
+
+# orjson é opcional: serialização mais rápida, com fallback para json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Cache em disco das respostas (ver api_cache)
+AMADEUS_CACHE_FILE = CACHE_DIR / 'amadeus.json'
+OPENSKY_CACHE_FILE = CACHE_DIR / 'opensky.json'
+
+# TTLs por cadência dos dados
+AMADEUS_OFFERS_TTL = 6 * 3600  # Ofertas de voo: 6h
+OPENSKY_TTL = 60               # Tráfego aéreo em tempo real
+
+# Parâmetros fixos da busca de ofertas Amadeus
+_BASE_PARAMS = {'adults': 1, 'currencyCode': 'BRL', 'max': 10}
+
+# Faixas de preços típicas SP → Recife (baseado em dados históricos)
+_PRICE_RANGES = {
+    'excelente': 300,    # Abaixo de R$300 = excelente
+    'boa': 450,          # R$300-450 = boa oferta
+    'regular': 600,      # R$450-600 = regular
+    'cara': 800          # Acima de R$600 = cara
+}
+
+# Taxas aproximadas dos programas: (nome, milhas por R$, mínimo doméstico, taxa média)
+_MILES_PROGRAMS = (
+    ('Smiles (GOL)', 0.025, 15000, 120),     # ~25 milhas por R$1
+    ('TudoAzul (Azul)', 0.022, 12000, 140),  # ~22 milhas por R$1
+    ('LATAM Pass', 0.020, 17000, 100),       # ~20 milhas por R$1
+    ('Livelo', 0.030, 20000, 80),            # ~30 pontos por R$1
+)
+
+
+def _write_json_file(path: str, data: Any):
+    """Salvar JSON indentado em UTF-8 (atômico: nunca deixa arquivo pela metade)"""
+    tmp_path = f"{path}.tmp"
+    if orjson:
+        with open(tmp_path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+@dataclass(slots=True, frozen=True)
+class PriceInfo:
+    """Dados essenciais de uma oferta de voo"""
+    price: float
+    origin: str
+    airline: str
+    departure_time: str
+    stops: int
+
 
 class FlightPriceChecker:
     """APIs especializadas em preços de passagens SP → Recife"""
@@ -27,39 +96,85 @@ class FlightPriceChecker:
         self.origins = ['GRU', 'CGH']  # Guarulhos e Congonhas
         self.destination = 'REC'  # Recife
         
+        # Requisições de rede efetivas por API (respostas do cache não contam)
+        self._api_calls = Counter()
+        self._api_calls_lock = threading.Lock()
+        
+        # Token Amadeus obtido sob demanda, uma vez por instância (só em cache miss)
+        self._amadeus_token_lock = threading.Lock()
+        self._amadeus_token_attempted = False
+        
+        # Prefixos de callsign das companhias comerciais (GOL, Azul, LATAM, Avianca)
+        self._airline_re = re.compile(r'GLO|AZU|TAM|ONE')
+        
+        # Sessão compartilhada (keep-alive) para as chamadas em paralelo,
+        # com retry/backoff em falhas transitórias e rate limit (429)
+        self.session = requests.Session()
+        retry = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=('GET', 'POST'),
+            respect_retry_after_header=True,
+            raise_on_status=False  # Último erro segue para raise_for_status
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
     def get_amadeus_token(self) -> Optional[str]:
         """Obter token Amadeus (2000 requests/mês GRÁTIS)"""
         if not self.amadeus_key or not self.amadeus_secret:
             return None
             
+        url = "https://test.api.amadeus.com/v1/security/oauth2/token"
+        data = {
+            'grant_type': 'client_credentials',
+            'client_id': self.amadeus_key,
+            'client_secret': self.amadeus_secret
+        }
+        
+        # Token só em memória (self.amadeus_token): nunca vai para o cache em disco,
+        # que é enviado ao cache do GitHub Actions
         try:
-            url = "https://test.api.amadeus.com/v1/security/oauth2/token"
-            data = {
-                'grant_type': 'client_credentials',
-                'client_id': self.amadeus_key,
-                'client_secret': self.amadeus_secret
-            }
-            
-            print(f"🔑 Solicitando token Amadeus...")
-            response = requests.post(url, data=data, timeout=10)
-            print(f"📡 Status Code: {response.status_code}")
-            
-            response.raise_for_status()
-            
-            token_data = response.json()
-            print(f"📄 Response keys: {list(token_data.keys())}")
-            
-            self.amadeus_token = token_data['access_token']
-            print(f"✅ Token Amadeus obtido com sucesso")
-            return self.amadeus_token
-            
-        except Exception as e:
-            print(f"❌ Erro token Amadeus: {e}")
-            if 'response' in locals():
-                print(f"📄 Response content: {response.text}")
+            logger.debug("🔑 Solicitando token Amadeus...")
+            token_data = self._request_json('amadeus', 'POST', url, data=data, timeout=10)
+        except requests.RequestException as e:
+            logger.warning("❌ Erro token Amadeus: %s", e)
+            if e.response is not None:
+                logger.warning("📄 Response content: %s", e.response.text)
+            return None
+        except ValueError as e:
+            logger.warning("❌ Erro token Amadeus: resposta inválida (%s)", e)
+            return None
+        
+        logger.debug("📄 Response keys: %s", list(token_data.keys()))
+        
+        if 'access_token' not in token_data:
+            logger.warning("❌ Erro token Amadeus: access_token ausente na resposta")
             return None
+        
+        self.amadeus_token = token_data['access_token']
+        logger.debug("✅ Token Amadeus obtido com sucesso")
+        return self.amadeus_token
+    
+    def _get_amadeus_token_once(self) -> Optional[str]:
+        """Token Amadeus sob demanda: uma única tentativa por instância, segura entre threads"""
+        with self._amadeus_token_lock:
+            if not self.amadeus_token and not self._amadeus_token_attempted:
+                self._amadeus_token_attempted = True
+                self.get_amadeus_token()
+            return self.amadeus_token
+    
+    def _request_json(self, api: str, method: str, url: str, **kwargs) -> Any:
+        """Requisição HTTP que falha em status de erro e retorna o JSON"""
+        with self._api_calls_lock:
+            self._api_calls[api] += 1
+        response = self.session.request(method, url, **kwargs)
+        response.raise_for_status()
+        return json_loads(response.content)
     
-    def get_sp_recife_prices(self, departure_date: str = None) -> Dict:
+    def get_sp_recife_prices(self, departure_date: str = None, timestamp: str = None) -> Dict:
         """
         FOCO: Preços atuais SP → Recife via Amadeus
         Retorna apenas os preços mais baratos encontrados
@@ -67,70 +182,78 @@ class FlightPriceChecker:
         if not departure_date:
             # Próxima segunda-feira (quando geralmente há mais voos)
             today = datetime.now()
-            days_ahead = 7 - today.weekday()  # Segunda = 0
-            if days_ahead <= 0:
-                days_ahead += 7
+            days_ahead = (-today.weekday()) % 7 or 7  # Segunda = 0; hoje segunda -> próxima
             departure_date = (today + timedelta(days=days_ahead)).strftime('%Y-%m-%d')
         
-        if not self.amadeus_token:
-            if not self.get_amadeus_token():
-                return {'error': 'Token não disponível'}
-        
         try:
             url = "https://test.api.amadeus.com/v2/shopping/flight-offers"
-            headers = {'Authorization': f'Bearer {self.amadeus_token}'}
             
             all_prices = []
+            total = 0.0
             
-            # Buscar de ambos aeroportos SP
-            for origin in self.origins:
-                params = {
-                    'originLocationCode': origin,
-                    'destinationLocationCode': self.destination,
-                    'departureDate': departure_date,
-                    'adults': 1,
-                    'currencyCode': 'BRL',
-                    'max': 10
-                }
+            base_params = {
+                **_BASE_PARAMS,
+                'destinationLocationCode': self.destination,
+                'departureDate': departure_date
+            }
+            
+            def fetch_offers(origin: str) -> Dict:
+                params = {**base_params, 'originLocationCode': origin}
                 
-                response = requests.get(url, headers=headers, params=params, timeout=15)
-                response.raise_for_status()
+                def fetch():
+                    # Token só é necessário quando a resposta não está em cache
+                    token = self._get_amadeus_token_once()
+                    if not token:
+                        raise RuntimeError('Token não disponível')
+                    headers = {'Authorization': f'Bearer {token}'}
+                    return self._request_json('amadeus', 'GET', url, headers=headers, params=params, timeout=15)
                 
-                data = response.json()
+                return cached_get_json(
+                    AMADEUS_CACHE_FILE, f"{origin}->{self.destination}:{departure_date}",
+                    ttl_seconds=AMADEUS_OFFERS_TTL, fetch_fn=fetch
+                )
+            
+            # Buscar de ambos aeroportos SP em paralelo
+            with ThreadPoolExecutor(max_workers=len(self.origins)) as executor:
+                responses = list(executor.map(fetch_offers, self.origins))
+            
+            for origin, data in zip(self.origins, responses):
                 if 'data' in data and data['data']:
                     for flight in data['data']:
                         price_info = self._extract_price_info(flight, origin)
                         if price_info:
                             all_prices.append(price_info)
+                            total += price_info.price
             
             if not all_prices:
                 return {'error': 'Nenhum voo encontrado'}
             
             # Ordenar por preço e retornar apenas os dados essenciais
-            all_prices.sort(key=lambda x: x['price'])
+            # (lista ordenada: mínimo e máximo são as pontas)
+            all_prices.sort(key=lambda x: x.price)
             cheapest = all_prices[0]
             
             return {
                 'route': 'SP → REC',
                 'date': departure_date,
-                'cheapest_price': cheapest['price'],
-                'cheapest_origin': cheapest['origin'],
-                'airline': cheapest['airline'],
-                'departure_time': cheapest['departure_time'],
+                'cheapest_price': cheapest.price,
+                'cheapest_origin': cheapest.origin,
+                'airline': cheapest.airline,
+                'departure_time': cheapest.departure_time,
                 'price_range': {
-                    'min': min(p['price'] for p in all_prices),
-                    'max': max(p['price'] for p in all_prices),
-                    'avg': round(sum(p['price'] for p in all_prices) / len(all_prices), 2)
+                    'min': cheapest.price,
+                    'max': all_prices[-1].price,
+                    'avg': round(total / len(all_prices), 2)
                 },
                 'flights_found': len(all_prices),
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': timestamp or datetime.now().isoformat(),
                 'source': 'Amadeus'
             }
             
         except Exception as e:
             return {'error': str(e)}
     
-    def get_opensky_recife_traffic(self) -> Dict:
+    def get_opensky_recife_traffic(self, timestamp: str = None) -> Dict:
         """
         Tráfego aéreo na região de Recife usando conta OpenSky (4000 requests grátis)
         """
@@ -151,36 +274,22 @@ class FlightPriceChecker:
                 # OpenSky usa Basic Auth com Client ID como username
                 auth = (self.opensky_client_id, self.opensky_client_secret or '')
                 auth_method = f"Client ID: {self.opensky_client_id} (4000 créditos)"
-                print(f"🔐 Usando OpenSky com {auth_method}")
+                logger.debug("🔐 Usando OpenSky com %s", auth_method)
             else:
                 auth = None
-                print("🌐 Usando OpenSky sem autenticação (ilimitado mas menos dados)")
-            
-            response = requests.get(url, params=params, auth=auth, headers=headers, timeout=15)
-            response.raise_for_status()
-            
-            data = response.json()
-            aircraft_count = len(data['states']) if data['states'] else 0
+                logger.debug("🌐 Usando OpenSky sem autenticação (ilimitado mas menos dados)")
             
-            # Analisar voos para Recife especificamente
-            flights_to_rec = []
-            sp_airports = ['GRU', 'CGH', 'VCP']  # São Paulo airports
-            
-            if data['states']:
-                for state in data['states']:
-                    if state[1]:  # Tem callsign
-                        callsign = state[1].strip()
-                        # Tentar identificar voos comerciais para Recife
-                        if any(airline in callsign for airline in ['GLO', 'AZU', 'TAM', 'ONE']):
-                            flights_to_rec.append({
-                                'callsign': callsign,
-                                'origin_country': state[2],
-                                'altitude': state[7],
-                                'velocity': state[9],
-                                'heading': state[10],
-                                'lat': state[6],
-                                'lon': state[5]
-                            })
+            # Resumo (contagem + voos comerciais) é extraído logo após o parse,
+            # então só ele fica em memória e no cache, não a lista de states
+            traffic = cached_get_json(
+                OPENSKY_CACHE_FILE, f"traffic:{params['lamin']},{params['lamax']},{params['lomin']},{params['lomax']}",
+                ttl_seconds=OPENSKY_TTL,
+                fetch_fn=lambda: self._summarize_opensky_states(
+                    self._request_json('opensky', 'GET', url, params=params, auth=auth, headers=headers, timeout=15)
+                )
+            )
+            aircraft_count = traffic['aircraft_count']
+            flights_to_rec = traffic['commercial_flights']
             
             return {
                 'source': f'OpenSky ({auth_method})',
@@ -189,13 +298,36 @@ class FlightPriceChecker:
                 'commercial_flights_detected': len(flights_to_rec),
                 'sample_flights': flights_to_rec[:3],  # Top 3
                 'air_traffic_level': self._assess_traffic_level(aircraft_count),
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': timestamp or datetime.now().isoformat(),
                 'api_status': 'success'
             }
             
         except Exception as e:
             return {'error': str(e), 'source': 'OpenSky'}
     
+    def _summarize_opensky_states(self, data: Dict) -> Dict:
+        """Reduzir a resposta OpenSky à contagem de aeronaves e aos voos comerciais"""
+        states = data.get('states') or []
+        
+        # Analisar voos para Recife especificamente
+        flights_to_rec = []
+        for state in states:
+            if state[1]:  # Tem callsign
+                callsign = state[1].strip()
+                # Tentar identificar voos comerciais para Recife
+                if self._airline_re.search(callsign):
+                    flights_to_rec.append({
+                        'callsign': callsign,
+                        'origin_country': state[2],
+                        'altitude': state[7],
+                        'velocity': state[9],
+                        'heading': state[10],
+                        'lat': state[6],
+                        'lon': state[5]
+                    })
+        
+        return {'aircraft_count': len(states), 'commercial_flights': flights_to_rec}
+    
     def _assess_traffic_level(self, aircraft_count: int) -> str:
         """Avaliar nível de tráfego aéreo"""
         if aircraft_count >= 15:
@@ -207,108 +339,88 @@ class FlightPriceChecker:
         else:
             return 'MUITO_BAIXO'
     
-    def _extract_price_info(self, flight_data: Dict, origin: str) -> Optional[Dict]:
+    def _extract_price_info(self, flight_data: Dict, origin: str) -> Optional[PriceInfo]:
         """Extrair apenas info essencial de preço"""
         try:
-            price = float(flight_data['price']['total'])
-            
-            # Primeiro segmento
-            segment = flight_data['itineraries'][0]['segments'][0]
-            departure_time = segment['departure']['at']
-            carrier = segment['carrierCode']
-            
-            return {
-                'price': price,
-                'origin': origin,
-                'airline': carrier,
-                'departure_time': departure_time,
-                'stops': len(flight_data['itineraries'][0]['segments']) - 1
-            }
-        except:
+            price = float((flight_data.get('price') or {}).get('total'))
+        except (TypeError, ValueError):  # Ausente, null ou não numérico
+            return None
+        
+        # Primeiro segmento (campos presentes mas null descartam só esta oferta)
+        itinerary = (flight_data.get('itineraries') or (None,))[0]
+        if not isinstance(itinerary, dict):
             return None
+        segments = itinerary.get('segments')
+        if not segments or not isinstance(segments[0], dict):
+            return None
+        segment = segments[0]
+        
+        return PriceInfo(
+            price=price,
+            origin=origin,
+            airline=segment.get('carrierCode', ''),
+            departure_time=(segment.get('departure') or {}).get('at', ''),
+            stops=len(segments) - 1
+        )
     
-    def estimate_miles_prices(self, cash_price: float) -> Dict:
+    def estimate_miles_prices(self, cash_price: float, timestamp: str = None) -> Dict:
         """
         Estimativa de preços em milhas baseada em preços em dinheiro
         Usando taxas médias dos programas brasileiros
         """
-        # Taxas aproximadas dos programas (milhas por R$)
-        miles_programs = {
-            'Smiles (GOL)': {
-                'rate': 0.025,  # ~25 milhas por R$1
-                'min_miles': 15000,  # Mínimo doméstico
-                'fees': 120  # Taxa média
-            },
-            'TudoAzul (Azul)': {
-                'rate': 0.022,  # ~22 milhas por R$1  
-                'min_miles': 12000,
-                'fees': 140
-            },
-            'LATAM Pass': {
-                'rate': 0.020,  # ~20 milhas por R$1
-                'min_miles': 17000,
-                'fees': 100
-            },
-            'Livelo': {
-                'rate': 0.030,  # ~30 pontos por R$1
-                'min_miles': 20000,
-                'fees': 80
-            }
-        }
-        
         estimates = {}
+        best_program = None
+        best_miles = None
         
-        for program, config in miles_programs.items():
+        for program, rate, min_miles, fees in _MILES_PROGRAMS:
             estimated_miles = max(
-                int(cash_price * config['rate'] * 1000),  # Converter para milhas
-                config['min_miles']
+                int(cash_price * rate * 1000),  # Converter para milhas
+                min_miles
             )
+            savings = cash_price - fees
             
             estimates[program] = {
                 'estimated_miles': estimated_miles,
-                'fees_brl': config['fees'],
-                'total_cost_brl': config['fees'],  # Apenas taxas se usar milhas
-                'savings_vs_cash': cash_price - config['fees'],
-                'worth_using_miles': (cash_price - config['fees']) > 50  # Vale a pena se economizar mais de R$50
+                'fees_brl': fees,
+                'total_cost_brl': fees,  # Apenas taxas se usar milhas
+                'savings_vs_cash': savings,
+                'worth_using_miles': savings > 50  # Vale a pena se economizar mais de R$50
             }
+            
+            # Menos milhas = melhor opção (primeiro vence em empate)
+            if best_miles is None or estimated_miles < best_miles:
+                best_miles = estimated_miles
+                best_program = program
         
         return {
             'cash_price_reference': cash_price,
             'programs': estimates,
-            'best_miles_option': min(estimates.keys(), 
-                                   key=lambda x: estimates[x]['estimated_miles']),
-            'timestamp': datetime.now().isoformat()
+            'best_miles_option': best_program,
+            'timestamp': timestamp or datetime.now().isoformat()
         }
     
-    def get_historical_price_trend(self) -> Dict:
+    def get_historical_price_trend(self, price_data: Dict = None, timestamp: str = None) -> Dict:
         """
         Simular tendência de preços usando dados atuais
         Útil para avaliar se um preço é uma boa oferta
+        Aceita preços já buscados para não repetir as chamadas Amadeus
         """
         try:
-            current_prices = self.get_sp_recife_prices()
+            current_prices = price_data if price_data is not None else self.get_sp_recife_prices(timestamp=timestamp)
             
             if 'error' in current_prices:
                 return current_prices
             
             current_price = current_prices['cheapest_price']
             
-            # Faixas de preços típicas SP → Recife (baseado em dados históricos)
-            price_ranges = {
-                'excelente': 300,    # Abaixo de R$300 = excelente
-                'boa': 450,          # R$300-450 = boa oferta  
-                'regular': 600,      # R$450-600 = regular
-                'cara': 800          # Acima de R$600 = cara
-            }
-            
             # Avaliar o preço atual
-            if current_price <= price_ranges['excelente']:
+            if current_price <= _PRICE_RANGES['excelente']:
                 rating = 'EXCELENTE'
-                savings = price_ranges['regular'] - current_price
-            elif current_price <= price_ranges['boa']:
+                savings = _PRICE_RANGES['regular'] - current_price
+            elif current_price <= _PRICE_RANGES['boa']:
                 rating = 'BOA'
-                savings = price_ranges['regular'] - current_price
-            elif current_price <= price_ranges['regular']:
+                savings = _PRICE_RANGES['regular'] - current_price
+            elif current_price <= _PRICE_RANGES['regular']:
                 rating = 'REGULAR'
                 savings = 0
             else:
@@ -319,9 +431,9 @@ class FlightPriceChecker:
                 'current_price': current_price,
                 'price_rating': rating,
                 'potential_savings': savings,
-                'price_ranges': price_ranges,
+                'price_ranges': dict(_PRICE_RANGES),  # Cópia: o resultado pode ser alterado
                 'recommendation': self._get_price_recommendation(rating, current_price),
-                'timestamp': datetime.now().isoformat()
+                'timestamp': timestamp or datetime.now().isoformat()
             }
             
         except Exception as e:
@@ -343,26 +455,39 @@ class FlightPriceChecker:
         Análise completa: preços em dinheiro + estimativas de milhas
         Otimizado para GitHub Actions (rápido e focado)
         """
-        print("🔍 Analisando preços SP → Recife...")
+        logger.info("🔍 Analisando preços SP → Recife...")
         
-        # 1. Preços atuais
-        price_data = self.get_sp_recife_prices(departure_date)
+        # Um único timestamp para todas as partes da análise
+        timestamp = datetime.now().isoformat()
+        calls_before = self._api_calls.copy()
+        
+        # 1. Preços atuais (origens buscadas em paralelo); sem preço não há análise,
+        # então o OpenSky só é consultado depois que os preços deram certo
+        price_data = self.get_sp_recife_prices(departure_date, timestamp=timestamp)
         
         if 'error' in price_data:
             return {
                 'error': price_data['error'],
-                'timestamp': datetime.now().isoformat()
+                'timestamp': timestamp
             }
         
-        # 2. Estimativas de milhas
-        cash_price = price_data['cheapest_price']
-        miles_estimates = self.estimate_miles_prices(cash_price)
-        
-        # 3. Análise de tendência
-        trend_analysis = self.get_historical_price_trend()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # Dados de tráfego aéreo (OpenSky) em paralelo com milhas e tendência
+            air_traffic_future = executor.submit(self.get_opensky_recife_traffic, timestamp)
+            
+            # 2. Estimativas de milhas
+            cash_price = price_data['cheapest_price']
+            miles_estimates = self.estimate_miles_prices(cash_price, timestamp=timestamp)
+            
+            # 3. Análise de tendência
+            trend_analysis = self.get_historical_price_trend(price_data=price_data, timestamp=timestamp)
+            
+            # 4. Dados de tráfego aéreo (OpenSky)
+            air_traffic = air_traffic_future.result()
         
-        # 4. Dados de tráfego aéreo (OpenSky)
-        air_traffic = self.get_opensky_recife_traffic()
+        # Requisições feitas nesta análise (cache hits não consomem cota)
+        amadeus_calls = self._api_calls['amadeus'] - calls_before['amadeus']
+        opensky_calls = self._api_calls['opensky'] - calls_before['opensky']
         
         # 5. Resultado consolidado
         result = {
@@ -379,18 +504,18 @@ class FlightPriceChecker:
             'trend_analysis': trend_analysis,
             'air_traffic': air_traffic,
             'api_usage': {
-                'amadeus_requests': 2,  # GRU + CGH
-                'opensky_requests': 1,
+                'amadeus_requests': amadeus_calls,  # Token + GRU + CGH, sem cache
+                'opensky_requests': opensky_calls,
                 'total_cost': 0.00,
                 'remaining_free_requests': {
-                    'amadeus': '~1998/2000',
-                    'opensky': '~3999/4000 créditos' if self.opensky_client_id else 'unlimited'
+                    'amadeus': f'~{2000 - amadeus_calls}/2000',
+                    'opensky': f'~{4000 - opensky_calls}/4000 créditos' if self.opensky_client_id else 'unlimited'
                 }
             },
-            'timestamp': datetime.now().isoformat()
+            'timestamp': timestamp
         }
         
-        print(f"✅ Análise concluída: R${cash_price:.0f} ({trend_analysis.get('price_rating', 'N/A')})")
+        logger.info("✅ Análise concluída: R$%.0f (%s)", cash_price, trend_analysis.get('price_rating', 'N/A'))
         
         return result
     
@@ -416,6 +541,8 @@ class FlightPriceChecker:
 
 def main():
     """Função principal para GitHub Actions"""
+    logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO').upper(), format='%(message)s')
+    
     print("🎯 Flight Price Checker - SP → Recife")
     print("=" * 50)
     
@@ -453,8 +580,7 @@ def main():
     print(f"   {github_output}")
     
     # Salvar resultado completo
-    with open('flight_analysis.json', 'w', encoding='utf-8') as f:
-        json.dump(analysis, f, indent=2, ensure_ascii=False)
+    _write_json_file('flight_analysis.json', analysis)
     
     print(f"\n✅ Análise salva em flight_analysis.json")
 
@@ -3,19 +3,34 @@
 Promo Alerts - Monitor RSS feeds for new travel promotions
 """
 
+import hashlib
 import json
+import logging
 import os
 import re
 import sys
-import time
+import threading
+import unicodedata
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Set, Optional
+from typing import Dict, List, Optional
 
 import feedparser
 import requests
 import yaml
 from dateutil import parser as date_parser
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# JSON com orjson quando disponível (seen.json, feed_cache.json, Telegram)
+from api_cache import json_dumps, json_loads
+
+# Mensagens de diagnóstico (análise de preços, APIs): LOG_LEVEL=DEBUG para detalhes
+logger = logging.getLogger(__name__)
 
 # Importar APIs de aviação
 try:
@@ -33,17 +48,186 @@ try:
 except ImportError:
     FLIGHT_PRICE_APIS_AVAILABLE = False
 
+# Padrões de preço (compilados uma vez no import)
+# Ordem importa: o formato mais comum ("R$ ...") primeiro. Ele também cobre
+# "por R$ 234,56" e "a partir de R$ 234,56", que não precisam de padrão próprio
+PRICE_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'R\$\s*(\d{1,3}(?:\.\d{3})*(?:,\d{2})?)',  # R$ 1.234,56 or R$ 234,56
+    r'(\d{1,3}(?:\.\d{3})*(?:,\d{2})?)\s*reais',  # 1.234,56 reais
+))
+
+# Tags HTML nos resumos dos feeds
+HTML_TAG_RE = re.compile(r'<[^<]+?>')
+
+# REGRA do filtro de keywords: Itália E (passagens OU milhas)
+ITALY_CITIES = (
+    'italia', 'italy',
+    'roma', 'rome',
+    'milao', 'milan', 'milano',
+    'veneza', 'venice', 'venezia',
+    'florenca', 'florence', 'firenze',
+    'napoles', 'naples', 'napoli',
+    'turin', 'turim', 'torino',
+    'bologna', 'genova', 'genoa',
+    'palermo', 'sicilia', 'sicily',
+    'sardinia', 'sardegna',
+)
+ITALY_AIRPORTS = ('fco', 'mxp', 'linate', 'vce', 'nap', 'bgy', 'cia')
+PASSAGEM_TERMS = (
+    'passagem', 'passagens', 'voo', 'voos', 'viagem', 'viagens',
+    'europa', 'europeu', 'voar', 'aereo', 'aerea', 'aereas',
+    'bilhete', 'bilhetes',
+    # Companhias que voam para a Itália
+    'latam', 'tap', 'alitalia', 'ita airways', 'lufthansa', 'air france', 'iberia',
+    'gru', 'gig',
+)
+
+
+def compile_terms(terms) -> re.Pattern:
+    """Compile substring terms into one alternation (one scan instead of N `in` checks)"""
+    # Longest first; an empty term list never matches, like any([])
+    escaped = [re.escape(term) for term in sorted(set(terms), key=len, reverse=True)]
+    return re.compile('|'.join(escaped) or '(?!)')
+
+
+# Palavras do texto (filtro de companhias aéreas compara tokens, não substrings)
+WORD_RE = re.compile(r'\w+')
+
+
+# Itália em uma única busca: cidade em qualquer posição, ou código de aeroporto
+# como palavra separada por espaços ou colado a um hífen (ex.: "gru-fco")
+_ITALY_AIRPORTS_ALT = '|'.join(ITALY_AIRPORTS)
+ITALY_RE = re.compile(
+    f"{compile_terms(ITALY_CITIES).pattern}"
+    f"|(?<![^ ])(?:{_ITALY_AIRPORTS_ALT})(?![^ ])"
+    f"|-(?:{_ITALY_AIRPORTS_ALT})|(?:{_ITALY_AIRPORTS_ALT})-"
+)
+
+
+# Heurística do filtro de preço: destino provavelmente internacional
+INTERNATIONAL_RE = compile_terms((
+    'internacional', 'europa', 'eua', 'asia', 'africa', 'oceania',
+    'paris', 'london', 'new york', 'tokyo', 'madrid', 'rome',
+))
+
+
+# Análise de preços: só para posts sobre voos para a Itália
+PRICE_ANALYSIS_ITALY_RE = compile_terms((
+    'italia', 'italy', 'roma', 'rome', 'milao', 'milan', 'milano',
+    'veneza', 'venice', 'florenca', 'florence', 'napoles', 'naples',
+    'fco', 'mxp', 'vce',
+))
+PRICE_ANALYSIS_FLIGHT_RE = compile_terms((
+    'voo', 'voos', 'passagem', 'passagens', 'voar', 'aereo', 'aerea',
+    'viagem', 'europa',
+))
+
+
+# Qualidade da oferta pelo % de economia sobre o preço de mercado (limites inclusivos)
+DEAL_QUALITY_THRESHOLDS = (5, 15, 30)
+DEAL_QUALITY_LABELS = ('REGULAR', 'BOA', 'MUITO_BOA', 'EXCELENTE')
+
+
+class _StripAccentsTable(dict):
+    """str.translate table that maps each code point to its NFD form without
+    combining marks (Mn), computed on first sight and memoized"""
+
+    def __missing__(self, codepoint: int) -> str:
+        decomposed = unicodedata.normalize('NFD', chr(codepoint))
+        stripped = ''.join(c for c in decomposed if unicodedata.category(c) != 'Mn')
+        self[codepoint] = stripped
+        return stripped
+
+
+STRIP_ACCENTS_TABLE = _StripAccentsTable()
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for matching"""
+    if not text:
+        return ""
+    # Remove accents and convert to lowercase (one C-level pass; ASCII has no accents)
+    if not text.isascii():
+        text = text.translate(STRIP_ACCENTS_TABLE)
+    return text.lower().strip()
+
+
+# Termos curtos de configuração (palavras-chave, rotas) se repetem; textos de
+# posts passam pela versão sem cache para não expulsar os termos do LRU
+normalize_term = lru_cache(maxsize=2048)(normalize_text)
+
+
+# Limite de IDs em seen.json: feeds só expõem os posts mais recentes, então IDs
+# antigos nunca reaparecem (os mais recentes/revistos ficam no fim; feeds sem
+# mudança renovam seus IDs via feed_cache para não perdê-los no corte)
+MAX_SEEN_POSTS = 5000
+
+# seen.json guarda hashes de tamanho fixo (blake2b de 8 bytes, em hex) em vez
+# dos IDs completos "feed:url"; IDs antigos são convertidos ao carregar
+SEEN_ID_RE = re.compile(r'[0-9a-f]{16}')
+
+
+def hash_post_id(post_id: str) -> str:
+    """Fixed-length key for a post ID in seen_posts"""
+    return hashlib.blake2b(post_id.encode('utf-8'), digest_size=8).hexdigest()
+
+# Feeds buscados em paralelo (hosts diferentes, espera é só de rede)
+FEED_FETCH_WORKERS = 8
+
+# print() escreve texto e "\n" separadamente; o lock evita linhas de feeds misturadas
+_PRINT_LOCK = threading.Lock()
+
+
+def print_line(message: str):
+    """Print a whole line at once from feed worker threads"""
+    with _PRINT_LOCK:
+        print(message)
+
 
 class PromoAlertsMonitor:
     def __init__(self, feeds_file: str = "feeds.yml", seen_file: str = "../data/seen.json", filters_file: str = "filters.yml"):
         self.feeds_file = feeds_file
         self.filters_file = filters_file
         self.seen_file = Path(__file__).parent / seen_file
-        self.seen_posts: Set[str] = set()
+        self.seen_posts: Dict[str, None] = {}  # Ordered set of hash_post_id keys: oldest first
+        # Validadores HTTP por feed (ETag / Last-Modified) para GET condicional,
+        # mais o hash do corpo para servidores que ignoram esses cabeçalhos
+        self.feed_cache_file = self.seen_file.parent / "feed_cache.json"
+        self.feed_cache: Dict[str, Dict] = {}
         self.new_posts: List[Dict] = []
         self.filtered_posts: List[Dict] = []
-        self.rejected_posts: List[Dict] = []
+        # Rejeitados: só a contagem e alguns títulos de exemplo (não os posts inteiros)
+        self.rejected_count = 0
+        self._rejected_samples = deque(maxlen=3)
         self.filters_config: Dict = {}
+        self._rejected_count_per_feed: Dict[str, int] = {}
+        
+        # Feeds are fetched in worker threads: guard shared state
+        self._lock = threading.Lock()
+        self._price_lock = threading.Lock()
+        self._price_cache: Dict[str, Dict] = {}
+        self._miles_cache: Dict[float, Dict] = {}  # Preço da promoção -> melhor programa de milhas
+        
+        # Sessão compartilhada entre os feeds (keep-alive, sem novo handshake TLS
+        # por feed), com retry/backoff em falhas transitórias e rate limit (429)
+        self.session = requests.Session()
+        self.session.headers.update({
+            # Set a proper User-Agent to avoid blocking
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Accept': 'application/rss+xml, application/xml, text/xml, */*',
+            'Accept-Language': 'pt-BR,pt;q=0.9,en;q=0.8',
+            'Cache-Control': 'no-cache'
+        })
+        retry = Retry(
+            total=2,
+            backoff_factor=0.5,
+            status_forcelist=(429, 502, 503, 504),
+            allowed_methods=('GET',),
+            raise_on_status=False  # Último erro segue para raise_for_status
+        )
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         
         # Initialize aviation APIs if available
         self.aviation_apis = AviationAPIIntegration() if AVIATION_APIS_AVAILABLE else None
@@ -58,35 +242,60 @@ class PromoAlertsMonitor:
         
         # Load configurations
         self.load_seen_posts()
+        self.load_feed_cache()
         self.load_filters_config()
     
     def load_seen_posts(self):
         """Load previously seen post IDs from file"""
         if self.seen_file.exists():
             try:
-                with open(self.seen_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.seen_posts = set(data.get('seen_posts', []))
-                    print(f"✅ Loaded {len(self.seen_posts)} seen posts")
+                data = json_loads(self.seen_file.read_bytes())
+                self.seen_posts = dict.fromkeys(
+                    post_id if SEEN_ID_RE.fullmatch(post_id) else hash_post_id(post_id)
+                    for post_id in data.get('seen_posts', [])
+                )
+                print(f"✅ Loaded {len(self.seen_posts)} seen posts")
             except (json.JSONDecodeError, FileNotFoundError) as e:
                 print(f"⚠️ Could not load seen posts: {e}")
-                self.seen_posts = set()
+                self.seen_posts = {}
         else:
             print("📝 No seen posts file found, starting fresh")
     
     def save_seen_posts(self):
         """Save seen post IDs to file"""
         try:
+            seen_posts = list(self.seen_posts)[-MAX_SEEN_POSTS:]
             data = {
-                'seen_posts': list(self.seen_posts),
+                'seen_posts': seen_posts,
                 'last_updated': datetime.now().isoformat()
             }
-            with open(self.seen_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            print(f"💾 Saved {len(self.seen_posts)} seen posts")
+            # Arquivo só é lido pelo próprio monitor: JSON compacto, sem indentação
+            self.seen_file.write_bytes(json_dumps(data))
+            print(f"💾 Saved {len(seen_posts)} seen posts")
         except Exception as e:
             print(f"❌ Error saving seen posts: {e}")
     
+    def load_feed_cache(self):
+        """Load per-feed ETag/Last-Modified validators and body digests from file"""
+        if not self.feed_cache_file.exists():
+            return
+        try:
+            self.feed_cache = json_loads(self.feed_cache_file.read_bytes()).get('feeds', {})
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"⚠️ Could not load feed cache: {e}")
+            self.feed_cache = {}
+    
+    def save_feed_cache(self):
+        """Save per-feed ETag/Last-Modified validators and body digests to file"""
+        try:
+            data = {
+                'feeds': self.feed_cache,
+                'last_updated': datetime.now().isoformat()
+            }
+            self.feed_cache_file.write_bytes(json_dumps(data))
+        except Exception as e:
+            print(f"❌ Error saving feed cache: {e}")
+    
     def load_filters_config(self):
         """Load filters configuration from YAML file"""
         try:
@@ -104,199 +313,136 @@ class PromoAlertsMonitor:
         except Exception as e:
             print(f"❌ Error loading filters: {e}")
             self.filters_config = {'enabled': False}
-    
-    def normalize_text(self, text: str) -> str:
-        """Normalize text for matching"""
-        if not text:
-            return ""
-        # Remove accents and convert to lowercase
-        import unicodedata
-        text = unicodedata.normalize('NFD', text)
-        text = ''.join(c for c in text if unicodedata.category(c) != 'Mn')
-        return text.lower().strip()
+
+        # Normalize and compile filter terms once instead of on every post
+        keywords_config = self.filters_config.get('keywords', {})
+        self._norm_passagem_terms = tuple(normalize_term(term) for term in PASSAGEM_TERMS)
+        self._norm_miles_terms = tuple(
+            normalize_term(term) for term in keywords_config.get('miles_keywords') or []
+        )
+        # Passagem OR milhas: a single scan answers both
+        self._trip_terms_re = compile_terms(self._norm_passagem_terms + self._norm_miles_terms)
+
+        routes_config = self.filters_config.get('routes', {})
+        self._has_include_routes = bool(routes_config.get('include'))
+        self._include_route_pairs, self._include_route_re = self._compile_routes(routes_config.get('include') or [])
+        self._exclude_route_pairs, self._exclude_route_re = self._compile_routes(routes_config.get('exclude') or [])
+
+        airlines_config = self.filters_config.get('airlines', {})
+        self._include_airlines, self._include_airline_phrases = self._split_airlines(airlines_config.get('include') or [])
+        self._exclude_airlines, self._exclude_airline_phrases = self._split_airlines(airlines_config.get('exclude') or [])
+
+    def _compile_routes(self, routes: List[str]):
+        """Split routes into normalized (origin, destination) pairs and one regex for single places"""
+        pairs = []
+        places = []
+        for route in routes:
+            if ' -> ' in route:
+                origin, destination = route.split(' -> ', 1)
+                pairs.append((normalize_term(origin), normalize_term(destination)))
+            else:
+                places.append(normalize_term(route))
+        return tuple(pairs), compile_terms(places)
+
+    def _split_airlines(self, airlines: List[str]):
+        """Split airline names into a frozenset of single words and a tuple of multi-word phrases"""
+        names = [airline.lower() for airline in airlines]
+        words = frozenset(name for name in names if WORD_RE.fullmatch(name))
+        phrases = tuple(name for name in names if name not in words)
+        return words, phrases
+
+    def _mentions_airline(self, words: frozenset, phrases: tuple, tokens: set, full_text: str) -> bool:
+        """Single-word names by token intersection, multi-word names (e.g. 'air france') by substring"""
+        return not words.isdisjoint(tokens) or any(phrase in full_text for phrase in phrases)
     
     def extract_price(self, text: str) -> Optional[float]:
         """Extract price from text"""
         if not text:
             return None
         
-        # Look for R$ patterns
-        price_patterns = [
-            r'R\$\s*(\d{1,3}(?:\.\d{3})*(?:,\d{2})?)',  # R$ 1.234,56 or R$ 234,56
-            r'(\d{1,3}(?:\.\d{3})*(?:,\d{2})?)\s*reais',  # 1.234,56 reais
-            r'por\s*R\$\s*(\d{1,3}(?:\.\d{3})*(?:,\d{2})?)',  # por R$ 234,56
-            r'partir\s+de\s*R\$\s*(\d{1,3}(?:\.\d{3})*(?:,\d{2})?)',  # a partir de R$ 234,56
-        ]
-        
-        for pattern in price_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
+        # Look for R$ patterns (search stops at the first match of each pattern)
+        for pattern in PRICE_PATTERNS:
+            match = pattern.search(text)
+            if match:
                 try:
                     # Convert Brazilian number format to float
-                    price_str = matches[0].replace('.', '').replace(',', '.')
+                    price_str = match.group(1).replace('.', '').replace(',', '.')
                     return float(price_str)
                 except ValueError:
                     continue
         
         return None
     
-    def check_route_filter(self, title: str, summary: str) -> bool:
-        """Check if post matches route filters"""
+    def check_route_filter(self, normalized_text: str) -> bool:
+        """Check if post matches route filters (expects normalize_text output)"""
         routes_config = self.filters_config.get('routes', {})
         if not routes_config.get('enabled', False):
             return True
         
-        full_text = f"{title} {summary}".lower()
-        normalized_text = self.normalize_text(full_text)
-        
-        # Check include routes
-        include_routes = routes_config.get('include', [])
-        if include_routes:
-            for route in include_routes:
-                if ' -> ' in route:
-                    origin, destination = route.split(' -> ')
-                    origin_norm = self.normalize_text(origin)
-                    dest_norm = self.normalize_text(destination)
-                    
-                    # Check if both origin and destination are mentioned
-                    if origin_norm in normalized_text and dest_norm in normalized_text:
-                        return True
-                else:
-                    # Single city/location
-                    if self.normalize_text(route) in normalized_text:
-                        return True
-            
-            # If we have include routes but none matched
-            return False
+        # Check include routes: both origin and destination, or a single city/location
+        if self._has_include_routes:
+            return bool(
+                self._include_route_re.search(normalized_text) or
+                any(origin in normalized_text and destination in normalized_text
+                    for origin, destination in self._include_route_pairs)
+            )
         
         # Check exclude routes
-        exclude_routes = routes_config.get('exclude', [])
-        for route in exclude_routes:
-            if ' -> ' in route:
-                origin, destination = route.split(' -> ')
-                origin_norm = self.normalize_text(origin)
-                dest_norm = self.normalize_text(destination)
-                
-                # If both are mentioned, exclude this post
-                if origin_norm in normalized_text and dest_norm in normalized_text:
-                    return False
-            else:
-                if self.normalize_text(route) in normalized_text:
-                    return False
-        
-        return True
+        if self._exclude_route_re.search(normalized_text):
+            return False
+        return not any(origin in normalized_text and destination in normalized_text
+                       for origin, destination in self._exclude_route_pairs)
     
-    def check_keyword_filter(self, title: str, summary: str) -> bool:
+    def check_keyword_filter(self, normalized_text: str) -> bool:
         """Check if post matches keyword filters - FOCO POSITIVO: Itália + Passagens + Milhas"""
         keywords_config = self.filters_config.get('keywords', {})
         if not keywords_config.get('enabled', False):
             return True
 
-        full_text = f"{title} {summary}".lower()
-        normalized_text = self.normalize_text(full_text)
-
         # REGRA: Deve mencionar Itália/cidade italiana/código de aeroporto
         # E algo relacionado a passagens/viagem/milhas
-        italy_cities = [
-            'italia', 'italy',
-            'roma', 'rome',
-            'milao', 'milan', 'milano',
-            'veneza', 'venice', 'venezia',
-            'florenca', 'florence', 'firenze',
-            'napoles', 'naples', 'napoli',
-            'turin', 'turim', 'torino',
-            'bologna', 'genova', 'genoa',
-            'palermo', 'sicilia', 'sicily',
-            'sardinia', 'sardegna',
-        ]
-        italy_airports = ['fco', 'mxp', 'linate', 'vce', 'nap', 'bgy', 'cia']
-
-        has_italy = (
-            any(city in normalized_text for city in italy_cities) or
-            any(f' {ap} ' in f' {normalized_text} ' or f'-{ap}' in normalized_text or f'{ap}-' in normalized_text
-                for ap in italy_airports)
-        )
+        has_italy = ITALY_RE.search(normalized_text) is not None
 
         # 2. Deve mencionar termos de passagens/voos
-        has_passagem_terms = any(term in normalized_text for term in [
-            self.normalize_text('passagem'),
-            self.normalize_text('passagens'),
-            self.normalize_text('voo'),
-            self.normalize_text('voos'),
-            self.normalize_text('viagem'),
-            self.normalize_text('viagens'),
-            self.normalize_text('europa'),
-            self.normalize_text('europeu'),
-            self.normalize_text('voar'),
-            self.normalize_text('aereo'),
-            self.normalize_text('aerea'),
-            self.normalize_text('aereas'),
-            self.normalize_text('bilhete'),
-            self.normalize_text('bilhetes'),
-            # Companhias que voam para a Itália
-            self.normalize_text('latam'),
-            self.normalize_text('tap'),
-            self.normalize_text('alitalia'),
-            self.normalize_text('ita airways'),
-            self.normalize_text('lufthansa'),
-            self.normalize_text('air france'),
-            self.normalize_text('iberia'),
-            'gru', 'gig',
-        ])
-
-        # 3. Termos relacionados a MILHAS (da configuração)
-        miles_keywords = keywords_config.get('miles_keywords', [])
-        has_miles_terms = any(self.normalize_text(term) in normalized_text for term in miles_keywords)
+        # 3. OU termos relacionados a MILHAS (da configuração)
+        has_trip_terms = self._trip_terms_re.search(normalized_text) is not None
 
         # Deve ter Itália E (passagens OU milhas) para passar
-        return has_italy and (has_passagem_terms or has_miles_terms)
+        return has_italy and has_trip_terms
     
-    def check_price_filter(self, title: str, summary: str) -> bool:
-        """Check if post matches price filters"""
+    def check_price_filter(self, full_text: str) -> bool:
+        """Check if post matches price filters (expects lowercased title + summary)"""
         price_config = self.filters_config.get('price', {})
         if not price_config.get('enabled', False):
             return True
         
-        full_text = f"{title} {summary}"
         price = self.extract_price(full_text)
         
         if price is None:
             return True  # If no price found, don't filter out
         
         # Check if it's likely international (rough heuristic)
-        is_international = any(word in full_text.lower() for word in [
-            'internacional', 'europa', 'eua', 'asia', 'africa', 'oceania',
-            'paris', 'london', 'new york', 'tokyo', 'madrid', 'rome'
-        ])
+        is_international = INTERNATIONAL_RE.search(full_text) is not None
         
         max_price = price_config.get('international_max', 2500) if is_international else price_config.get('domestic_max', 800)
         
         return price <= max_price
     
-    def check_airline_filter(self, title: str, summary: str) -> bool:
-        """Check if post matches airline filters"""
+    def check_airline_filter(self, full_text: str) -> bool:
+        """Check if post matches airline filters (expects lowercased title + summary)"""
         airlines_config = self.filters_config.get('airlines', {})
         if not airlines_config.get('enabled', False):
             return True
         
-        full_text = f"{title} {summary}".lower()
+        tokens = set(WORD_RE.findall(full_text))
         
         # Check include airlines
-        include_airlines = airlines_config.get('include', [])
-        if include_airlines:
-            for airline in include_airlines:
-                if airline.lower() in full_text:
-                    break
-            else:
-                return False
+        if (self._include_airlines or self._include_airline_phrases) and not self._mentions_airline(
+                self._include_airlines, self._include_airline_phrases, tokens, full_text):
+            return False
         
         # Check exclude airlines
-        exclude_airlines = airlines_config.get('exclude', [])
-        for airline in exclude_airlines:
-            if airline.lower() in full_text:
-                return False
-        
-        return True
+        return not self._mentions_airline(self._exclude_airlines, self._exclude_airline_phrases, tokens, full_text)
     
     def apply_filters(self, post: Dict) -> bool:
         """Apply all filters to a post - FOCO: Itália + Passagens"""
@@ -306,21 +452,28 @@ class PromoAlertsMonitor:
         title = post.get('title', '')
         summary = post.get('summary', '')
 
-        keyword_passed = self.check_keyword_filter(title, summary)
+        # Fast path: promos usually name the destination and the deal in the title.
+        # A match on the (short) normalized title is also a match on the full text,
+        # so the summary - often several KB - is only normalized when needed
+        if title and not title[-1].isspace() and self.check_keyword_filter(normalize_text(title.lower())):
+            return True
 
-        if not keyword_passed and self.filters_config.get('advanced', {}).get('log_rejected_posts', False):
-            if not hasattr(self, '_rejected_count_per_feed'):
-                self._rejected_count_per_feed = {}
+        # Build and normalize the post text once; checkers receive the precomputed strings
+        full_text = f"{title} {summary}".lower()
+        normalized_text = normalize_text(full_text)
 
+        keyword_passed = self.check_keyword_filter(normalized_text)
+
+        if not keyword_passed and self.filters_config.get('advanced', {}).get('log_rejected_posts', False):
             feed_name = post.get('feed_name', 'unknown')
             count = self._rejected_count_per_feed.get(feed_name, 0)
 
             if count < 3:
-                print(f"  🔍 Post filtered out: NÃO é sobre passagens/milhas para a Itália")
-                print(f"    📝 Title: {title[:60]}...")
+                print_line(f"  🔍 Post filtered out ({feed_name}): NÃO é sobre passagens/milhas para a Itália\n"
+                           f"    📝 Title: {title[:60]}...")
                 self._rejected_count_per_feed[feed_name] = count + 1
             elif count == 3:
-                print(f"  🔍 ... (mais posts rejeitados - não são sobre a Itália)")
+                print_line(f"  🔍 ... ({feed_name}: mais posts rejeitados - não são sobre a Itália)")
                 self._rejected_count_per_feed[feed_name] = count + 1
 
         return keyword_passed
@@ -342,48 +495,44 @@ class PromoAlertsMonitor:
         posts = []
         
         try:
-            print(f"🔍 {progress}Fetching feed: {feed_name}")
+            print_line(f"🔍 {progress}Fetching feed: {feed_name}")
             
-            # Set a proper User-Agent to avoid blocking
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'application/rss+xml, application/xml, text/xml, */*',
-                'Accept-Language': 'pt-BR,pt;q=0.9,en;q=0.8',
-                'Cache-Control': 'no-cache'
-            }
+            # Conditional GET: unchanged feeds answer 304 without a body
+            validators = self.feed_cache.get(feed_url, {})
+            headers = {}
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
             
-            # Fetch with timeout and retry logic (otimizado)
-            max_retries = 2
-            for attempt in range(max_retries):
-                try:
-                    response = requests.get(feed_url, headers=headers, timeout=15, allow_redirects=True)
-                    response.raise_for_status()
-                    break
-                except requests.exceptions.Timeout:
-                    if attempt < max_retries - 1:
-                        print(f"  ⏱️ Timeout on attempt {attempt + 1}, retrying...")
-                        time.sleep(1)
-                        continue
-                    else:
-                        print(f"  ❌ Feed timeout after {max_retries} attempts, skipping...")
-                        return []
-                except requests.exceptions.RequestException as e:
-                    if attempt < max_retries - 1 and "403" not in str(e):
-                        print(f"  🔄 Error on attempt {attempt + 1}, retrying...")
-                        time.sleep(1)
-                        continue
-                    else:
-                        raise
+            # Fetch with timeout (retries handled by the session adapter)
+            response = self.session.get(feed_url, headers=headers, timeout=15, allow_redirects=True)
+            if response.status_code == 304:
+                self._refresh_seen(validators.get('seen', ()))
+                print_line(f"  ⏭️ {feed_name}: feed not modified since last run")
+                return []
+            response.raise_for_status()
+            
+            # Servers that ignore conditional GETs: identical body means nothing new,
+            # so skip feedparser (the expensive part) entirely
+            content_digest = hashlib.blake2b(response.content, digest_size=16).hexdigest()
+            if validators.get('digest') == content_digest:
+                self._refresh_seen(validators.get('seen', ()))
+                print_line(f"  ⏭️ {feed_name}: feed content unchanged since last run")
+                return []
             
             # Parse feed
             feed = feedparser.parse(response.content)
             
             if feed.bozo:
-                print(f"⚠️ Feed parsing warning for {feed_name}: {feed.bozo_exception}")
+                print_line(f"⚠️ Feed parsing warning for {feed_name}: {feed.bozo_exception}")
+            
+            # Seen keys of the entries currently in the feed (refreshed on skipped runs)
+            feed_seen_keys = []
             
             # Process entries (check if entries exist)
             if not feed.entries:
-                print(f"  ⚠️ No entries found in feed")
+                print_line(f"  ⚠️ No entries found in feed {feed_name}")
             else:
                 # Process entries (limitado a 5 para ser mais rápido)
                 for entry in feed.entries[:5]:  # Limit to latest 5 posts
@@ -393,8 +542,11 @@ class PromoAlertsMonitor:
                     if not post_id or post_id.endswith(':'):
                         continue
                     
-                    # Skip if already seen
-                    if post_id in self.seen_posts:
+                    # Skip if already seen (and mark as recent so it isn't trimmed)
+                    seen_key = hash_post_id(post_id)
+                    feed_seen_keys.append(seen_key)
+                    if seen_key in self.seen_posts:
+                        self._refresh_seen((seen_key,))
                         continue
                     
                     # Parse publication date
@@ -431,22 +583,43 @@ class PromoAlertsMonitor:
                             post = self.enhance_post_with_price_analysis(post)
                         
                         posts.append(post)
-                        self.filtered_posts.append(post)
                     else:
-                        self.rejected_posts.append(post)
+                        with self._lock:
+                            self.rejected_count += 1
+                            self._rejected_samples.append(post['title'])
                     
                     # Always add to seen posts to avoid reprocessing
-                    self.seen_posts.add(post_id)
+                    with self._lock:
+                        self.seen_posts[seen_key] = None
+            
+            # Remember validators only once the entries were processed
+            validators = {
+                key: value for key, value in (
+                    ('etag', response.headers.get('ETag')),
+                    ('last_modified', response.headers.get('Last-Modified')),
+                ) if value
+            }
+            validators['digest'] = content_digest
+            validators['seen'] = feed_seen_keys
+            with self._lock:
+                self.feed_cache[feed_url] = validators
             
-            print(f"  ✅ Found {len(posts)} new posts from {feed_name}")
+            print_line(f"  ✅ Found {len(posts)} new posts from {feed_name}")
             
         except requests.RequestException as e:
-            print(f"  ❌ Network error for {feed_name}: {e}")
+            print_line(f"  ❌ Network error for {feed_name}: {e}")
         except Exception as e:
-            print(f"  ❌ Error processing {feed_name}: {e}")
+            print_line(f"  ❌ Error processing {feed_name}: {e}")
         
         return posts
     
+    def _refresh_seen(self, seen_keys):
+        """Move seen keys to the end of seen_posts so trimming keeps them"""
+        with self._lock:
+            for seen_key in seen_keys:
+                self.seen_posts.pop(seen_key, None)
+                self.seen_posts[seen_key] = None
+    
     def monitor_feeds(self):
         """Monitor all configured feeds for new posts"""
         feeds = self.load_feeds()
@@ -459,24 +632,29 @@ class PromoAlertsMonitor:
         print("=" * 50)
 
         feeds_with_errors = 0
-        for i, feed in enumerate(feeds, 1):
-            feed_name = feed.get('name', 'Unknown Feed')
-            feed_url = feed.get('url', '')
+        futures = []
+        with ThreadPoolExecutor(max_workers=FEED_FETCH_WORKERS) as executor:
+            for i, feed in enumerate(feeds, 1):
+                feed_name = feed.get('name', 'Unknown Feed')
+                feed_url = feed.get('url', '')
 
-            if not feed_url:
-                print(f"⚠️ No URL configured for feed: {feed_name}")
-                feeds_with_errors += 1
-                continue
+                if not feed_url:
+                    print_line(f"⚠️ No URL configured for feed: {feed_name}")
+                    feeds_with_errors += 1
+                    continue
 
-            progress = f"[{i}/{len(feeds)}] "
-            try:
-                new_posts = self.fetch_feed(feed_url, feed_name, progress)
-            except Exception:
-                feeds_with_errors += 1
-                new_posts = []
-            self.new_posts.extend(new_posts)
+                progress = f"[{i}/{len(feeds)}] "
+                futures.append(executor.submit(self.fetch_feed, feed_url, feed_name, progress))
 
-            time.sleep(0.5)
+            # Collect in configuration order so notifications keep the feed order
+            for future in futures:
+                try:
+                    new_posts = future.result()
+                except Exception:
+                    feeds_with_errors += 1
+                    new_posts = []
+                self.new_posts.extend(new_posts)
+                self.filtered_posts.extend(new_posts)
 
         print("=" * 50)
         self._feeds_checked = len(feeds)
@@ -484,16 +662,16 @@ class PromoAlertsMonitor:
         
         # Show filtering statistics
         if self.filters_config.get('enabled', False):
-            total_found = len(self.filtered_posts) + len(self.rejected_posts)
+            total_found = len(self.filtered_posts) + self.rejected_count
             print(f"📊 Filtering Summary:")
             print(f"  🔍 Total posts found: {total_found}")
             print(f"  ✅ Posts passed filters: {len(self.filtered_posts)}")
-            print(f"  ❌ Posts rejected by filters: {len(self.rejected_posts)}")
+            print(f"  ❌ Posts rejected by filters: {self.rejected_count}")
             
-            if len(self.rejected_posts) > 0 and self.filters_config.get('advanced', {}).get('log_rejected_posts', False):
+            if self.rejected_count > 0 and self.filters_config.get('advanced', {}).get('log_rejected_posts', False):
                 print(f"\n🚫 Rejected posts examples:")
-                for post in self.rejected_posts[:3]:  # Show first 3 rejected
-                    print(f"  📝 {post['title'][:50]}...")
+                for title in self._rejected_samples:  # Last 3 rejected
+                    print(f"  📝 {title[:50]}...")
         else:
             print(f"📊 Summary: Found {len(self.new_posts)} new posts total (no filters applied)")
         
@@ -505,12 +683,12 @@ class PromoAlertsMonitor:
             
             # Send "no promotions found" notification if enabled and enough posts analyzed
             if self.filters_config.get('advanced', {}).get('notify_when_no_results', False):
-                # Calculate total posts analyzed from new_posts + rejected_posts
-                total_analyzed = len(self.new_posts) + len(self.rejected_posts)
+                # Calculate total posts analyzed from new_posts + rejected posts
+                total_analyzed = len(self.new_posts) + self.rejected_count
                 min_analyzed = self.filters_config.get('advanced', {}).get('no_results_min_posts_analyzed', 10)
                 
                 if total_analyzed >= min_analyzed:
-                    self.send_no_promotions_notification(total_analyzed, len(self.rejected_posts))
+                    self.send_no_promotions_notification(total_analyzed, self.rejected_count)
                 else:
                     print(f"📊 Only {total_analyzed} posts analyzed (minimum {min_analyzed} for no-results notification)")
             
@@ -518,8 +696,9 @@ class PromoAlertsMonitor:
         else:
             self.new_posts = self.filtered_posts if self.filters_config.get('enabled', False) else self.new_posts
         
-        # Save seen posts
+        # Save seen posts (and the feed validators that depend on them)
         self.save_seen_posts()
+        self.save_feed_cache()
 
         # Save results for the web portal
         self.save_results_json(
@@ -550,8 +729,7 @@ class PromoAlertsMonitor:
             summary = post.get('summary', '')
             if summary and len(summary) < 300:
                 # Clean HTML tags from summary
-                import re
-                clean_summary = re.sub('<[^<]+?>', '', summary).strip()
+                clean_summary = HTML_TAG_RE.sub('', summary).strip()
                 if clean_summary:
                     print(f"   💬 {clean_summary[:200]}{'...' if len(clean_summary) > 200 else ''}")
         
@@ -616,7 +794,11 @@ class PromoAlertsMonitor:
                 'disable_web_page_preview': True
             }
             
-            response = requests.post(telegram_url, json=payload, timeout=10)
+            # Reuse the pooled session (keep-alive); POSTs are not retried, so no duplicates
+            response = self.session.post(
+                telegram_url, data=json_dumps(payload),
+                headers={'Content-Type': 'application/json'}, timeout=10
+            )
             
             if response.status_code == 200:
                 print(f"✅ Telegram notification sent successfully!")
@@ -656,7 +838,7 @@ class PromoAlertsMonitor:
                     'link': p['link'],
                     'published': p.get('published'),
                     'discovered_at': p.get('discovered_at'),
-                    'summary': re.sub('<[^<]+?>', '', p.get('summary', ''))[:300],
+                    'summary': HTML_TAG_RE.sub('', p.get('summary', ''))[:300],
                 }
                 for p in self.new_posts
             ]
@@ -714,13 +896,16 @@ Sistema buscando apenas passagens para a Itália 🇮🇹
 🔄 Próxima verificação em 2-3 horas"""
 
             url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-            data = {
+            payload = {
                 'chat_id': chat_id,
                 'text': message,
                 'parse_mode': 'Markdown'
             }
             
-            response = requests.post(url, data=data, timeout=30)
+            response = self.session.post(
+                url, data=json_dumps(payload),
+                headers={'Content-Type': 'application/json'}, timeout=30
+            )
             
             if response.status_code == 200:
                 print(f"✅ 'No promotions' notification sent to Telegram")
@@ -739,18 +924,17 @@ Sistema buscando apenas passagens para a Itália 🇮🇹
             return post
 
         try:
-            print(f"💰 Analisando preços para: {post.get('title', '')[:50]}...")
+            logger.debug("💰 Analisando preços para: %s...", post.get('title', '')[:50])
 
             cache_key = f"brazil_italy_prices_{datetime.now().strftime('%Y%m%d_%H')}"
 
-            if not hasattr(self, '_price_cache'):
-                self._price_cache = {}
-
-            if cache_key not in self._price_cache:
-                price_analysis = self.price_checker.get_complete_sp_recife_analysis()
-                self._price_cache[cache_key] = price_analysis
-            else:
-                price_analysis = self._price_cache[cache_key]
+            # Only one feed thread runs the (network-bound) analysis per hour
+            with self._price_lock:
+                if cache_key not in self._price_cache:
+                    price_analysis = self.price_checker.get_complete_sp_recife_analysis()
+                    self._price_cache[cache_key] = price_analysis
+                else:
+                    price_analysis = self._price_cache[cache_key]
 
             if 'error' not in price_analysis:
                 promo_price = self.extract_price(f"{post.get('title', '')} {post.get('summary', '')}")
@@ -780,37 +964,42 @@ Sistema buscando apenas passagens para a Itália 🇮🇹
                     })
 
                 if promo_price:
-                    miles_estimates = self.price_checker.estimate_miles_prices(promo_price)
-                    deal_analysis['miles_alternative'] = {
-                        'best_program': miles_estimates['best_miles_option'],
-                        'estimated_miles': miles_estimates['programs'][miles_estimates['best_miles_option']]['estimated_miles'],
-                        'worth_using_miles': miles_estimates['programs'][miles_estimates['best_miles_option']]['worth_using_miles']
-                    }
+                    deal_analysis['miles_alternative'] = self._miles_alternative(promo_price)
 
                 post['price_analysis'] = deal_analysis
 
         except Exception as e:
-            print(f"⚠️ Erro na análise de preços: {e}")
+            logger.warning("⚠️ Erro na análise de preços: %s", e)
             post['price_analysis'] = {'error': str(e)}
 
         return post
 
+    def _miles_alternative(self, promo_price: float) -> Dict:
+        """Melhor programa de milhas para o preço (memoizado: promoções repetem preços)"""
+        alternative = self._miles_cache.get(promo_price)
+        if alternative is None:
+            miles_estimates = self.price_checker.estimate_miles_prices(promo_price)
+            best_program = miles_estimates['best_miles_option']
+            alternative = {
+                'best_program': best_program,
+                'estimated_miles': miles_estimates['programs'][best_program]['estimated_miles'],
+                'worth_using_miles': miles_estimates['programs'][best_program]['worth_using_miles']
+            }
+            self._miles_cache[promo_price] = alternative
+        return dict(alternative)
+
     def _is_post_about_italy_flights(self, post: Dict) -> bool:
         """Verificar se post é especificamente sobre voos para a Itália"""
-        text = self.normalize_text(f"{post.get('title', '')} {post.get('summary', '')}")
-
-        has_italy = any(term in text for term in [
-            'italia', 'italy', 'roma', 'rome', 'milao', 'milan', 'milano',
-            'veneza', 'venice', 'florenca', 'florence', 'napoles', 'naples',
-            'fco', 'mxp', 'vce',
-        ])
+        # Título primeiro: se ele já responde, o resumo não é normalizado
+        title_text = normalize_text(post.get('title', ''))
+        if (PRICE_ANALYSIS_ITALY_RE.search(title_text) is not None and
+                PRICE_ANALYSIS_FLIGHT_RE.search(title_text) is not None):
+            return True
 
-        has_flight_terms = any(term in text for term in [
-            'voo', 'voos', 'passagem', 'passagens', 'voar', 'aereo', 'aerea',
-            'viagem', 'europa',
-        ])
+        text = normalize_text(f"{post.get('title', '')} {post.get('summary', '')}")
 
-        return has_italy and has_flight_terms
+        return (PRICE_ANALYSIS_ITALY_RE.search(text) is not None and
+                PRICE_ANALYSIS_FLIGHT_RE.search(text) is not None)
     
     def _rate_deal_quality(self, promo_price: float, market_price: float) -> str:
         """Avaliar qualidade da oferta"""
@@ -819,14 +1008,7 @@ Sistema buscando apenas passagens para a Itália 🇮🇹
         
         savings_pct = ((market_price - promo_price) / market_price) * 100
         
-        if savings_pct >= 30:
-            return 'EXCELENTE'
-        elif savings_pct >= 15:
-            return 'MUITO_BOA'
-        elif savings_pct >= 5:
-            return 'BOA'
-        else:
-            return 'REGULAR'
+        return DEAL_QUALITY_LABELS[bisect_right(DEAL_QUALITY_THRESHOLDS, savings_pct)]
     
 
     
@@ -843,22 +1025,26 @@ Sistema buscando apenas passagens para a Itália 🇮🇹
                 
                 # Create a summary for the first few posts
                 summary_posts = self.new_posts[:3]  # Show first 3 posts
-                summary_text = "🔥 NOVAS PROMOÇÕES ENCONTRADAS!\n\n"
-                
-                for post in summary_posts:
-                    summary_text += f"📰 **{post['feed_name']}**\n"
-                    summary_text += f"📝 [{post['title']}]({post['link']})\n\n"
+                parts = ["🔥 NOVAS PROMOÇÕES ENCONTRADAS!\n\n"]
+                parts.extend(
+                    f"📰 **{post['feed_name']}**\n📝 [{post['title']}]({post['link']})\n\n"
+                    for post in summary_posts
+                )
                 
                 if len(self.new_posts) > 3:
-                    summary_text += f"... e mais {len(self.new_posts) - 3} promoções!\n"
+                    parts.append(f"... e mais {len(self.new_posts) - 3} promoções!\n")
                 
-                # Escape for GitHub Actions
-                summary_text = summary_text.replace('\n', '\\n').replace('"', '\\"')
-                f.write(f"posts_summary={summary_text}\n")
+                # Multi-line output (heredoc): no escaping needed. Random delimiter so a
+                # post title can never close the block and inject other outputs
+                delimiter = f"PROMO_EOF_{os.urandom(8).hex()}"
+                summary_text = "".join(parts)
+                f.write(f"posts_summary<<{delimiter}\n{summary_text}\n{delimiter}\n")
 
 
 def main():
     """Main execution function"""
+    logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO').upper(), format='%(message)s')
+
     print("🎯 Promo Alerts Monitor — Brasil → Itália 🇮🇹")
     print(f"⏰ Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
@@ -3,20 +3,94 @@
 Integração com APIs gratuitas de aviação e voos
 """
 
+import logging
+import re
 import requests
 import json
+from copy import deepcopy
 from datetime import datetime
-from typing import Optional, Dict, List
+from functools import lru_cache
+from typing import Any, Optional, Dict, List
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from api_cache import CACHE_DIR, cached_get_json, json_loads
+
+# Falhas das APIs são silenciosas no fluxo normal; LOG_LEVEL=DEBUG para ver o motivo
+logger = logging.getLogger(__name__)
+
+# Dados praticamente estáticos: cache em memória (por execução) e em disco (entre execuções)
+PUBLIC_APIS_CACHE_FILE = CACHE_DIR / 'public_apis.json'
+STATIC_DATA_TTL = 7 * 24 * 3600  # Aeroportos e CEPs: 7 dias
+IBGE_CITIES_TTL = 24 * 3600      # Municípios de PE: 1 dia
+
+# Timeouts (conexão, leitura): DNS/conexão lenta falha rápido sem gastar o orçamento todo
+SHORT_TIMEOUT = (3, 7)
+LONG_TIMEOUT = (3, 12)
+
+# Região de cada UF (montado uma vez, não a cada chamada)
+REGIONS_BY_STATE = {
+    'AC': 'Norte', 'AL': 'Nordeste', 'AP': 'Norte', 'AM': 'Norte',
+    'BA': 'Nordeste', 'CE': 'Nordeste', 'DF': 'Centro-Oeste',
+    'ES': 'Sudeste', 'GO': 'Centro-Oeste', 'MA': 'Nordeste',
+    'MT': 'Centro-Oeste', 'MS': 'Centro-Oeste', 'MG': 'Sudeste',
+    'PA': 'Norte', 'PB': 'Nordeste', 'PR': 'Sul', 'PE': 'Nordeste',
+    'PI': 'Nordeste', 'RJ': 'Sudeste', 'RN': 'Nordeste',
+    'RS': 'Sul', 'RO': 'Norte', 'RR': 'Norte', 'SC': 'Sul',
+    'SP': 'Sudeste', 'SE': 'Nordeste', 'TO': 'Norte'
+}
+
+
+# Menções a Recife/PE (compiladas uma vez: uma busca por post em vez de um `in` por termo)
+RECIFE_TERMS_RE = re.compile('|'.join(re.escape(term) for term in ('recife', 'pernambuco', ' pe ', 'rec')))
+
+
+def _create_session() -> requests.Session:
+    """Sessão com pool de conexões e retry/backoff em falhas transitórias"""
+    session = requests.Session()
+    session.headers.update({
+        'User-Agent': 'Mozilla/5.0 (compatible; PromoAlertsBot/1.0)'
+    })
+    retry = Retry(
+        total=2,
+        backoff_factor=0.2,
+        status_forcelist=(429, 502, 503, 504),
+        allowed_methods=('GET',),
+        raise_on_status=False  # Último erro segue para a checagem de status
+    )
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+# Sessão única por processo: todas as instâncias reaproveitam as conexões
+# (keep-alive) com opensky, airport-data, viacep e ibge
+_SESSION = _create_session()
+
+
+@lru_cache(maxsize=1024)
+def _get_static_json(url: str, ttl_seconds: int, timeout: tuple) -> Any:
+    """
+    GET JSON de dados estáticos, cacheado por URL (erros não são cacheados)
+    O resultado é compartilhado entre chamadas: copiar antes de alterar
+    """
+    def fetch():
+        response = _SESSION.get(url, timeout=timeout)
+        if response.status_code >= 400:
+            # Exceção (não None) para que nenhuma das camadas de cache guarde o erro
+            raise requests.HTTPError(f"{response.status_code} for {url}", response=response)
+        return json_loads(response.content)
+    
+    return cached_get_json(PUBLIC_APIS_CACHE_FILE, url, ttl_seconds, fetch)
 
 
 class AviationAPIIntegration:
     """Integração com APIs gratuitas de aviação para dados de voos"""
     
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (compatible; PromoAlertsBot/1.0)'
-        })
+        self.session = _SESSION
     
     def get_opensky_flights_to_recife(self) -> List[Dict]:
         """
@@ -36,31 +110,34 @@ class AviationAPIIntegration:
                 'lomax': lon_max
             }
             
-            response = self.session.get(url, params=params, timeout=15)
-            response.raise_for_status()
+            response = self.session.get(url, params=params, timeout=LONG_TIMEOUT)
+            if response.status_code >= 400:
+                return []
             
-            data = response.json()
+            data = json_loads(response.content)
             flights = []
             
             if data and 'states' in data and data['states']:
                 for state in data['states']:
-                    if len(state) >= 11:
-                        flight = {
-                            'icao24': state[0],
-                            'callsign': state[1].strip() if state[1] else 'N/A',
-                            'origin_country': state[2],
-                            'latitude': state[6],
-                            'longitude': state[5], 
-                            'altitude': state[7],
-                            'velocity': state[9]
-                        }
-                        flights.append(flight)
+                    if len(state) < 11:
+                        continue
+                    # Vetor de estado OpenSky: icao24, callsign, país, ..., lon, lat, altitude, _, velocidade
+                    icao24, callsign, origin_country, _, _, longitude, latitude, altitude, _, velocity, *_ = state
+                    flights.append({
+                        'icao24': icao24,
+                        'callsign': callsign.strip() if callsign else 'N/A',
+                        'origin_country': origin_country,
+                        'latitude': latitude,
+                        'longitude': longitude,
+                        'altitude': altitude,
+                        'velocity': velocity
+                    })
                 
 
                 return flights
             
         except Exception as e:
-            pass
+            logger.debug("OpenSky indisponível: %s", e)
         
         return []
     
@@ -72,15 +149,13 @@ class AviationAPIIntegration:
             # API gratuita de aeroportos
             url = f"https://www.airport-data.com/api/ap_info.json?iata={airport_code}"
             
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = _get_static_json(url, STATIC_DATA_TTL, SHORT_TIMEOUT)
             if data:
-                return data
+                # Cópia: o dict em cache é compartilhado com as próximas consultas
+                return deepcopy(data)
             
         except Exception as e:
-            pass
+            logger.debug("Aeroporto %s indisponível: %s", airport_code, e)
         
         return None
     
@@ -98,10 +173,7 @@ class AviationAPIIntegration:
             
             url = f"https://viacep.com.br/ws/{clean_cep}/json/"
             
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = _get_static_json(url, STATIC_DATA_TTL, SHORT_TIMEOUT)
             
             # Verificar se CEP é válido
             if 'erro' not in data:
@@ -113,23 +185,13 @@ class AviationAPIIntegration:
                 }
         
         except Exception as e:
-            pass
+            logger.debug("ViaCEP indisponível para %s: %s", cep, e)
         
         return None
     
     def get_region_by_state(self, state: str) -> str:
         """Mapear estado para região"""
-        regions = {
-            'AC': 'Norte', 'AL': 'Nordeste', 'AP': 'Norte', 'AM': 'Norte',
-            'BA': 'Nordeste', 'CE': 'Nordeste', 'DF': 'Centro-Oeste',
-            'ES': 'Sudeste', 'GO': 'Centro-Oeste', 'MA': 'Nordeste',
-            'MT': 'Centro-Oeste', 'MS': 'Centro-Oeste', 'MG': 'Sudeste',
-            'PA': 'Norte', 'PB': 'Nordeste', 'PR': 'Sul', 'PE': 'Nordeste',
-            'PI': 'Nordeste', 'RJ': 'Sudeste', 'RN': 'Nordeste',
-            'RS': 'Sul', 'RO': 'Norte', 'RR': 'Norte', 'SC': 'Sul',
-            'SP': 'Sudeste', 'SE': 'Nordeste', 'TO': 'Norte'
-        }
-        return regions.get(state, 'Desconhecida')
+        return REGIONS_BY_STATE.get(state, 'Desconhecida')
     
     def get_ibge_cities_pe(self) -> List[Dict]:
         """
@@ -140,10 +202,7 @@ class AviationAPIIntegration:
             # Estado de PE = código 26
             url = "https://servicodados.ibge.gov.br/api/v1/localidades/estados/PE/municipios"
             
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
-            
-            cities = response.json()
+            cities = _get_static_json(url, IBGE_CITIES_TTL, LONG_TIMEOUT)
             
             # Simplificar dados
             pe_cities = []
@@ -157,7 +216,7 @@ class AviationAPIIntegration:
             return pe_cities
         
         except Exception as e:
-            pass
+            logger.debug("Municípios do IBGE indisponíveis: %s", e)
         
         return []
     
@@ -166,16 +225,13 @@ class AviationAPIIntegration:
     def enhance_post_with_apis(self, post: Dict) -> Dict:
         """
         Enriquecer post com dados de APIs públicas
+        Altera o próprio dict (o chamador é dono do post) e o retorna
         """
-        enhanced = post.copy()
-        
-        # Analisar texto para termos de aviação
-        text = f"{post.get('title', '')} {post.get('summary', '')}"
-        
-        # Buscar por menções a Recife/PE e enriquecer silenciosamente
-        if any(term in text.lower() for term in ['recife', 'pernambuco', ' pe ', 'rec']):
-            enhanced['aviation_enhanced'] = True
+        # Buscar por menções a Recife/PE e enriquecer silenciosamente:
+        # título primeiro, texto completo (com o resumo) só se o título não bastar
+        title = post.get('title', '')
+        if (RECIFE_TERMS_RE.search(title.lower()) or
+                RECIFE_TERMS_RE.search(f"{title} {post.get('summary', '')}".lower())):
+            post['aviation_enhanced'] = True
         
-        return enhanced
-    
-
+        return post